@@ -1,8 +1,16 @@
 import requests
+from requests.adapters import HTTPAdapter
 import csv
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+
 url = "https://wax.greymass.com/v1/chain/get_table_rows"
 payload = {
     "code": "hq.mu",
@@ -13,16 +21,61 @@ payload = {
     "json": True
 }
 
+# Eine Session mit Keep-Alive und gzip für alle Anfragen
+session = requests.Session()
+session.headers.update({"User-Agent": "TLM_Pools Data Collector", "Accept-Encoding": "gzip"})
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
 csv_file = "minepooldata.csv"
 file_exists = Path(csv_file).exists()
 
+# Vorhandene IDs: pyarrow-Array (schneller C++-Parser) oder als Fallback ein Set
+existing_ids = set()
+if file_exists:
+    try:
+        with open(csv_file, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if "id" not in header:
+                print("CSV hat keine ID-Spalte, überspringe Duplikatsprüfung")
+            else:
+                id_idx = header.index("id")
+                try:
+                    if pa is None:
+                        raise ImportError("pyarrow nicht installiert")
+                    # Header überspringen und Spalten durchnummerieren - toleriert das Komma am Header-Ende
+                    id_col = f"f{id_idx}"
+                    table = pacsv.read_csv(
+                        csv_file,
+                        read_options=pacsv.ReadOptions(skip_rows=1, autogenerate_column_names=True),
+                        convert_options=pacsv.ConvertOptions(include_columns=[id_col],
+                                                             column_types={id_col: pa.string()}))
+                    existing_ids = table.column(id_col).combine_chunks()
+                except (ImportError, ValueError):
+                    # Nur die ID-Spalte lesen, ohne Dict pro Zeile
+                    existing_ids = {row[id_idx] for row in reader if len(row) > id_idx}
+    except (csv.Error, IOError) as e:
+        print(f"CSV-Lesefehler: {e}")
+        existing_ids = set()
+
+# Höchste gespeicherte snapshot_id als Cursor - nur neuere Zeilen abfragen
+if isinstance(existing_ids, set):
+    last_id = max((int(i) for i in existing_ids if i.isdigit()), default=None)
+else:
+    try:
+        last_id = pc.max(pc.cast(existing_ids, pa.int64())).as_py()
+    except ValueError:
+        last_id = None
+if last_id is not None:
+    payload["lower_bound"] = str(last_id + 1)
+
 try:
-    response = requests.post(url, json=payload, timeout=10, headers={"User-Agent": "TLM_Pools Data Collector"})
+    response = session.post(url, json=payload, timeout=(3, 10))
     response.raise_for_status()
     data = response.json().get("rows", [])
 
     if not data:
-        print("No data found in API response.")
+        print(f"No new data found in API response. Existing entries: {len(existing_ids)}")
         exit()
 
     processed_data = []
@@ -50,20 +103,12 @@ try:
     if processed_data:
         fieldnames = ["id", "date", "pool", "raw_timestamp"]
 
-        existing_ids = set()
-        if file_exists:
-            try:
-                with open(csv_file, "r") as f:
-                    reader = csv.DictReader(f)
-                    if not reader.fieldnames or "id" not in reader.fieldnames:
-                        print("CSV hat keine ID-Spalte, überspringe Duplikatsprüfung")
-                    else:
-                        existing_ids = {str(row["id"]) for row in reader}
-            except (csv.Error, IOError) as e:
-                print(f"CSV-Lesefehler: {e}")
-                existing_ids = set()
-
-        new_rows = [row for row in processed_data if row["id"] not in existing_ids]
+        if isinstance(existing_ids, set):
+            new_rows = [row for row in processed_data if row["id"] not in existing_ids]
+        else:
+            new_ids = pa.array([row["id"] for row in processed_data], type=pa.string())
+            is_new = pc.invert(pc.is_in(new_ids, value_set=existing_ids)).to_pylist()
+            new_rows = [row for row, keep in zip(processed_data, is_new) if keep]
 
         if new_rows:
             try:
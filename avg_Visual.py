@@ -1,10 +1,132 @@
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import json
+import orjson
 from datetime import datetime, timedelta
 import matplotlib.dates as mdates
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Übersetzungstabelle für einfache -> doppelte Anführungszeichen (ältere avgpool-Zeilen)
+_QUOTES = str.maketrans("'", '"')
+
+# Ab dieser Anzahl Tage wird die Gesamtansicht per LTTB heruntergerechnet
+MAX_BARS = 2000
+DOWNSAMPLED_BARS = 1500
+
+# Auflösung und feste Ränder der gespeicherten Diagramme
+SAVE_DPI = 120
+BAR_CHART_MARGINS = dict(left=0.06, right=0.98, top=0.88, bottom=0.18)
+ALL_POOLS_MARGINS = dict(left=0.04, right=0.99, top=0.88, bottom=0.1, hspace=0.3, wspace=0.15)
+
+def plot_bar_chart(data, pool_type, col_name, days=None, save_dir=None, ax=None):
+    """Zeichnet das Balkendiagramm einer Pool-Spalte und speichert es optional.
+    Wird eine Achse übergeben, wird deren Figur wiederverwendet statt eine neue anzulegen."""
+    # Daten filtern basierend auf dem Zeitraum
+    chart_data = data[['day', col_name, 'numberofentries']].copy()
+
+    if days is not None:
+        # Filtere die Daten auf die letzten X Tage
+        latest_date = chart_data['day'].max()
+        cutoff_date = latest_date - timedelta(days=days)
+        chart_data = chart_data[chart_data['day'] >= cutoff_date]
+        time_period = f" (Last {days} days)"
+        filename_suffix = f"_{days}days"
+    else:
+        time_period = ""
+        filename_suffix = ""
+
+    chart_data = chart_data.sort_values('day')
+
+    if len(chart_data) == 0:
+        print(f"⚠️ Keine Daten für Pool '{pool_type}' im angegebenen Zeitraum")
+        return
+
+    avg_value = chart_data[col_name].mean()
+    max_value = chart_data[col_name].max()
+    min_value = chart_data[col_name].min()
+    total_entries = chart_data['numberofentries'].sum()
+    total_days = len(chart_data)
+
+    # Bei sehr langer Historie auf ca. Bildbreite herunterrechnen (Statistiken bleiben exakt)
+    if days is None and len(chart_data) > MAX_BARS:
+        from tsdownsample import MinMaxLTTBDownsampler
+        idx = MinMaxLTTBDownsampler().downsample(
+            chart_data['day'].values.astype('datetime64[s]').astype('int64'),
+            chart_data[col_name].values,
+            n_out=DOWNSAMPLED_BARS)
+        chart_data = chart_data.iloc[idx]
+
+    # Wiederverwendete Achse leeren oder eine eigene Figur anlegen
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = plt.subplots(figsize=(15, 8))
+    else:
+        fig = ax.figure
+        ax.clear()
+
+    ax.bar(chart_data['day'], chart_data[col_name],
+           color='steelblue', alpha=0.7, edgecolor='navy', linewidth=0.5)
+
+    ax.set_title(f'Pool: {pool_type}{time_period}\n'
+                 f'Average: {avg_value:.4f} TLM | Max: {max_value:.4f} TLM | Min: {min_value:.4f} TLM',
+                 fontsize=16, fontweight='bold', pad=20)
+
+    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+    ax.set_ylabel(f'{pool_type} Pool (TLM)', fontsize=12, fontweight='bold')
+
+    date_range = (chart_data['day'].max() - chart_data['day'].min()).days
+
+    if date_range <= 7 or days == 7:
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%a\n%d.%m.%Y'))
+        ax.xaxis.set_major_locator(mdates.DayLocator())
+    elif date_range <= 31 or days == 30:
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, date_range // 10)))
+    else:
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%Y'))
+        ax.xaxis.set_major_locator(mdates.MonthLocator())
+
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+    ax.grid(True, alpha=0.3, linestyle='--')
+
+    # Feste Ränder statt tight_layout/bbox_inches='tight' - spart einen zusätzlichen Render-Durchlauf
+    fig.subplots_adjust(**BAR_CHART_MARGINS)
+
+    info_text = f'Anzahl Tage: {total_days} | Gesamt Einträge: {total_entries}'
+    info = fig.text(0.02, 0.02, info_text, fontsize=10, alpha=0.7)
+
+    if save_dir:
+        # Erstelle den Ordner, falls er nicht existiert
+        os.makedirs(save_dir, exist_ok=True)
+        # Erstelle den Dateinamen
+        filename = f"pool_{pool_type}{filename_suffix}.png"
+        filepath = os.path.join(save_dir, filename)
+        fig.savefig(filepath, dpi=SAVE_DPI)
+        print(f"💾 Diagramm gespeichert als: {filepath}")
+    else:
+        plt.show()
+
+    # Fremde Figur für den nächsten Aufruf aufräumen, eigene schließen
+    if own_figure:
+        plt.close(fig)
+    else:
+        info.remove()
+
+# Pro Worker-Prozess wiederverwendete Achse für die Einzeldiagramme
+_worker_ax = None
+
+def _render_one(task):
+    """Rendert ein einzelnes Pool-Diagramm in einem Worker-Prozess"""
+    global _worker_ax
+    if _worker_ax is None:
+        matplotlib.use('Agg')
+        _, _worker_ax = plt.subplots(figsize=(15, 8))
+    chart_data, pool_type, col_name, days, save_dir = task
+    plot_bar_chart(chart_data, pool_type, col_name, days=days, save_dir=save_dir, ax=_worker_ax)
 
 class PoolDataVisualizer:
     def __init__(self, csv_file):
@@ -17,7 +139,13 @@ class PoolDataVisualizer:
         """Lädt die CSV-Daten"""
         try:
             print(f"🔄 Lade Daten aus {self.csv_file}...")
-            self.df = pd.read_csv(self.csv_file)
+            try:
+                self.df = pd.read_csv(self.csv_file, engine='pyarrow', dtype_backend='pyarrow',
+                                      usecols=['day', 'avgpool', 'numberofentries'])
+            except (ImportError, ValueError):
+                # Ohne pyarrow oder bei unsauberer Datei auf die C-Engine zurückfallen
+                self.df = pd.read_csv(self.csv_file, engine='c', low_memory=False,
+                                      usecols=['day', 'avgpool', 'numberofentries'])
             print(f"✅ {len(self.df)} Datensätze erfolgreich geladen")
             return True
         except FileNotFoundError:
@@ -34,9 +162,9 @@ class PoolDataVisualizer:
         all_keys = set()
         valid_pools = []
 
-        for idx, row in self.df.iterrows():
+        for idx, pool_str in enumerate(self.df['avgpool'].tolist()):
             try:
-                pool_data = json.loads(row['avgpool'].replace("'", '"'))
+                pool_data = orjson.loads(pool_str.translate(_QUOTES))
                 valid_pools.append(pool_data)
 
                 for item in pool_data:
@@ -46,103 +174,32 @@ class PoolDataVisualizer:
                 print(f"⚠️ Fehler beim Parsen von Zeile {idx}: {e}")
                 valid_pools.append([])
 
-        for key in all_keys:
-            self.df[f'pool_{key}'] = 0.0
+        # Spalten als float32-Arrays aufbauen und einmalig an den DataFrame anhängen
+        cols = {f'pool_{key}': np.zeros(len(self.df), dtype=np.float32) for key in all_keys}
 
-        for idx, pool_data in enumerate(valid_pools):
-            if pool_data: 
-                for item in pool_data:
-                    key = item['key']
-                    value = float(item['value'].replace(' TLM', ''))
-                    self.df.at[idx, f'pool_{key}'] = value
+        for i, pool_data in enumerate(valid_pools):
+            for item in pool_data:
+                cols[f'pool_{item["key"]}'][i] = float(item['value'][:-4])
 
-        self.df['day'] = pd.to_datetime(self.df['day'])
+        self.df = self.df.join(pd.DataFrame(cols, index=self.df.index))
+
+        # avg_pools schreibt den Tag immer als YYYY-MM-DD - festes Format statt Formaterkennung
+        self.df['day'] = pd.to_datetime(self.df['day'], format='%Y-%m-%d', cache=True).astype('datetime64[s]')
 
         print(f"✅ Pool-Daten erfolgreich geparst")
         print(f"📊 Verfügbare Pool-Typen: {sorted(all_keys)}")
 
         self.parsed_pools = {key: f'pool_{key}' for key in all_keys}
 
-    def create_bar_chart(self, pool_type, days=None, save_dir=None):
-        """Erstellt Balkendiagramm für einen bestimmten Pool-Typ und Zeitraum und speichert es optional"""
+    def create_bar_chart(self, pool_type, days=None, save_dir=None, ax=None):
+        """Erstellt Balkendiagramm für einen bestimmten Pool-Typ und Zeitraum und speichert es optional.
+        Wird eine Achse übergeben, wird deren Figur wiederverwendet statt eine neue anzulegen."""
         if pool_type not in self.parsed_pools:
             print(f"❌ Pool-Typ '{pool_type}' nicht gefunden!")
             return
 
-        col_name = self.parsed_pools[pool_type]
-
-        # Daten filtern basierend auf dem Zeitraum
-        chart_data = self.df[['day', col_name, 'numberofentries']].copy()
-        
-        if days is not None:
-            # Filtere die Daten auf die letzten X Tage
-            latest_date = chart_data['day'].max()
-            cutoff_date = latest_date - timedelta(days=days)
-            chart_data = chart_data[chart_data['day'] >= cutoff_date]
-            time_period = f" (Last {days} days)"
-            filename_suffix = f"_{days}days"
-        else:
-            time_period = ""
-            filename_suffix = ""
-
-        chart_data = chart_data.sort_values('day')
-
-        if len(chart_data) == 0:
-            print(f"⚠️ Keine Daten für Pool '{pool_type}' im angegebenen Zeitraum")
-            return
-
-        avg_value = chart_data[col_name].mean()
-        max_value = chart_data[col_name].max()
-        min_value = chart_data[col_name].min()
-        total_entries = chart_data['numberofentries'].sum()
-
-        plt.figure(figsize=(15, 8))
-
-        bars = plt.bar(chart_data['day'], chart_data[col_name], 
-                      color='steelblue', alpha=0.7, edgecolor='navy', linewidth=0.5)
-
-        plt.title(f'Pool: {pool_type}{time_period}\n'
-                 f'Average: {avg_value:.4f} TLM | Max: {max_value:.4f} TLM | Min: {min_value:.4f} TLM',
-                 fontsize=16, fontweight='bold', pad=20)
-
-        plt.xlabel('Date', fontsize=12, fontweight='bold')
-        plt.ylabel(f'{pool_type} Pool (TLM)', fontsize=12, fontweight='bold')
-
-        ax = plt.gca()
-
-        date_range = (chart_data['day'].max() - chart_data['day'].min()).days
-
-        if date_range <= 7 or days == 7:
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%a\n%d.%m.%Y'))
-            ax.xaxis.set_major_locator(mdates.DayLocator())
-        elif date_range <= 31 or days == 30:
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
-            ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, date_range // 10)))
-        else:
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%Y'))
-            ax.xaxis.set_major_locator(mdates.MonthLocator())
-
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-
-        plt.grid(True, alpha=0.3, linestyle='--')
-
-        plt.tight_layout()
-
-        info_text = f'Anzahl Tage: {len(chart_data)} | Gesamt Einträge: {total_entries}'
-        plt.figtext(0.02, 0.02, info_text, fontsize=10, alpha=0.7)
-
-        if save_dir:
-            # Erstelle den Ordner, falls er nicht existiert
-            os.makedirs(save_dir, exist_ok=True)
-            # Erstelle den Dateinamen
-            filename = f"pool_{pool_type}{filename_suffix}.png"
-            filepath = os.path.join(save_dir, filename)
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            print(f"💾 Diagramm gespeichert als: {filepath}")
-        else:
-            plt.show()
-        
-        plt.close()
+        plot_bar_chart(self.df, pool_type, self.parsed_pools[pool_type],
+                       days=days, save_dir=save_dir, ax=ax)
 
     def _create_all_pools_chart(self, save_dir=None):
         """Erstellt ein kombiniertes Diagramm für alle Pool-Typen und speichert es optional"""
@@ -152,43 +209,49 @@ class PoolDataVisualizer:
         cols = 3
         rows = (n_pools + cols - 1) // cols
 
-        plt.figure(figsize=(20, 5 * rows))
-        plt.suptitle('All Pools', fontsize=20, fontweight='bold')
+        # Einmal sortieren und alle Achsen in einem Schritt anlegen
+        df_sorted = self.df.sort_values('day')
+
+        fig, axes = plt.subplots(rows, cols, figsize=(20, 5 * rows), sharex=True, squeeze=False)
+        fig.suptitle('All Pools', fontsize=20, fontweight='bold')
 
-        for i, pool_type in enumerate(sorted(pool_types), 1):
+        for i, (ax, pool_type) in enumerate(zip(axes.flat, sorted(pool_types))):
             col_name = self.parsed_pools[pool_type]
 
-            plt.subplot(rows, cols, i)
+            ax.bar(df_sorted['day'], df_sorted[col_name],
+                   color=plt.cm.Set3(i + 1), alpha=0.7)
 
-            chart_data = self.df[['day', col_name]].copy()
-            chart_data = chart_data.sort_values('day')
+            ax.set_title(f'{pool_type}\n(Ø {df_sorted[col_name].mean():.4f} TLM)',
+                         fontweight='bold')
+            ax.set_ylabel('TLM')
+            ax.grid(True, alpha=0.3)
 
-            plt.bar(chart_data['day'], chart_data[col_name], 
-                   color=plt.cm.Set3(i), alpha=0.7)
+            # Unterste Achse jeder Spalte bekommt Datumsbeschriftung
+            if i + cols >= n_pools:
+                ax.xaxis.set_tick_params(labelbottom=True)
+                ax.set_xlabel('Date')
 
-            plt.title(f'{pool_type}\n(Ø {chart_data[col_name].mean():.4f} TLM)', 
-                     fontweight='bold')
-            plt.xlabel('Date')
-            plt.ylabel('TLM')
+        # Leere Felder im Raster ausblenden
+        for ax in axes.flat[n_pools:]:
+            ax.set_visible(False)
 
-            # X-Achse formatieren
-            ax = plt.gca()
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
+        # X-Achse einmal formatieren - gilt über sharex für alle Diagramme
+        axes.flat[0].xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
+        for ax in axes.flat[max(0, n_pools - cols):n_pools]:
             plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-            plt.grid(True, alpha=0.3)
 
-        plt.tight_layout()
+        fig.subplots_adjust(**ALL_POOLS_MARGINS)
         
         if save_dir:
             # Erstelle den Ordner, falls er nicht existiert
             os.makedirs(save_dir, exist_ok=True)
             filepath = os.path.join(save_dir, "all_pools.png")
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
+            fig.savefig(filepath, dpi=SAVE_DPI)
             print(f"💾 Kombiniertes Diagramm gespeichert als: {filepath}")
         else:
             plt.show()
         
-        plt.close()
+        plt.close(fig)
 
     def run_sequential(self, save_dir="pool_plots"):
         """Startet den sequentiellen Modus - speichert alle Pools als Bilder in Unterordnern"""
@@ -219,19 +282,19 @@ class PoolDataVisualizer:
         pool_types = sorted(self.parsed_pools.keys())
         
         print(f"\n📊 Erstelle {len(pool_types)} einzelne Pool-Diagramme...")
-        
-        for i, pool_type in enumerate(pool_types, 1):
-            print(f"📊 Erstelle Diagramm {i}/{len(pool_types)}: {pool_type}")
-            
-            # Vollständigen Zeitraum (alle Daten)
-            self.create_bar_chart(pool_type, save_dir=all_time_dir)
-            
-            # Letzte 30 Tage
-            self.create_bar_chart(pool_type, days=30, save_dir=thirty_days_dir)
-            
-            # Letzte 7 Tage
-            self.create_bar_chart(pool_type, days=7, save_dir=seven_days_dir)
-            
+
+        # Jedes Diagramm ist unabhängig - auf mehrere Prozesse verteilen
+        tasks = []
+        for pool_type in pool_types:
+            col_name = self.parsed_pools[pool_type]
+            chart_data = self.df[['day', col_name, 'numberofentries']]
+            tasks.append((chart_data, pool_type, col_name, None, all_time_dir))
+            tasks.append((chart_data, pool_type, col_name, 30, thirty_days_dir))
+            tasks.append((chart_data, pool_type, col_name, 7, seven_days_dir))
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(_render_one, tasks))
+
         print(f"\n✅ Alle {len(pool_types)} Pool-Diagramme wurden gespeichert!")
         print(f"📁 Bilder gespeichert in:")
         print(f"   - {all_time_dir} (Alle Daten)")
@@ -6,101 +6,186 @@ während die ursprünglichen Keys (Abundant, Common, Epic, Legendary, Mythical,
 """
 
 import pandas as pd
-import json
+import numpy as np
+import orjson
 import ast
 from datetime import datetime
 from collections import defaultdict
 import sys
 
-def parse_pool_data(pool_str):
+def _load_pool(pool_str):
     """
-    Parse pool data string und extrahiere key-value Paare
+    Lade einen einzelnen, bereits normalisierten Pool-String als Liste von Pool-Einträgen
 
     Args:
-        pool_str: String mit Pool-Daten im JSON-ähnlichen Format
+        pool_str: Pool-String mit doppelten Anführungszeichen
 
     Returns:
-        Dictionary mit Pool-Keys und ihren entsprechenden TLM-Werten
+        Liste von Dictionaries (leer, falls der String nicht geparst werden kann)
     """
-    pool_data = {}
+    if not isinstance(pool_str, str) or not pool_str:
+        return []
+
+    try:
+        return orjson.loads(pool_str)
+    except orjson.JSONDecodeError:
+        pass
 
+    # Fallback für die seltenen Zeilen, die kein valides JSON ergeben
     try:
-        # Versuche zuerst als valides JSON zu parsen
-        if isinstance(pool_str, str) and pool_str.strip():
-            # Entferne mögliche Anführungszeichen am Anfang und Ende
-            clean_str = pool_str.strip('"').strip("'")
-
-            # Versuche ast.literal_eval (sicherer als eval)
-            pool_list = ast.literal_eval(clean_str)
-
-            for item in pool_list:
-                if isinstance(item, dict) and 'key' in item and 'value' in item:
-                    # Extrahiere numerischen Wert aus Strings wie "0.1083 TLM"
-                    value_str = str(item['value']).replace(' TLM', '').strip()
-                    try:
-                        pool_data[item['key']] = float(value_str)
-                    except ValueError:
-                        print(f"Warning: Could not convert value '{value_str}' to float for key '{item['key']}'")
-
-    except (json.JSONDecodeError, ValueError, SyntaxError) as e:
+        return ast.literal_eval(pool_str.strip('"'))
+    except (ValueError, SyntaxError) as e:
         print(f"Warning: Could not parse pool data: {pool_str[:100]}... Error: {e}")
+        return []
+
+def parse_pool_column(pools):
+    """
+    Parse alle Pool-Strings einer Spalte in ein langes Format
+
+    Args:
+        pools: Series mit Pool-Strings im JSON-ähnlichen Format
+
+    Returns:
+        DataFrame mit den Spalten 'row' (Zeilenposition), 'key' und 'value' (TLM als float64)
+    """
+    rows, keys, values = [], [], []
+
+    # Whitespace und Anführungszeichen einmal für die ganze Spalte normalisieren
+    normalized = pools.astype('string').str.strip().str.replace("'", '"', regex=False)
+
+    for row, pool_str in enumerate(normalized.tolist()):
+        pool_list = _load_pool(pool_str)
+        if not isinstance(pool_list, list):
+            continue
 
-    return pool_data
+        for item in pool_list:
+            if isinstance(item, dict) and 'key' in item and 'value' in item:
+                value_str = str(item['value'])
+                rows.append(row)
+                keys.append(item['key'])
+                # Werte haben das feste Format "0.1083 TLM" - Suffix per Slice statt replace entfernen
+                values.append(value_str[:-4] if value_str[-4:] == ' TLM' else value_str)
 
-def extract_date(date_str):
+    long = pd.DataFrame({'row': np.asarray(rows, dtype=np.int64), 'key': keys, 'value': values})
+
+    numeric = pd.to_numeric(long['value'], errors='coerce')
+    invalid = numeric.isna()
+
+    for key, value in zip(long.loc[invalid, 'key'], long.loc[invalid, 'value']):
+        print(f"Warning: Could not convert value '{value}' to float for key '{key}'")
+
+    long['value'] = numeric.astype('float64')
+
+    return long[~invalid].reset_index(drop=True)
+
+def read_csv_fast(path, usecols):
     """
-    Extrahiere Datumsteil aus datetime string
+    Lese ausgewählte Spalten einer CSV-Datei, bevorzugt mit der pyarrow-Engine
 
     Args:
-        date_str: Datum-String im Format "YYYY-MM-DD HH:MM:SS" oder ähnlich
+        path: Pfad zur CSV-Datei
+        usecols: Liste der benötigten Spalten
 
     Returns:
-        Datum-String im Format "YYYY-MM-DD"
+        DataFrame mit den angeforderten Spalten
     """
     try:
-        if 'T' in str(date_str):
-            date_part = str(date_str).split('T')[0]
-        else:
-            date_part = str(date_str).split(' ')[0]
-        return date_part
-    except:
-        return str(date_str)
+        return pd.read_csv(path, engine='pyarrow', dtype_backend='pyarrow', usecols=usecols)
+    except (ImportError, ValueError):
+        # Ohne pyarrow oder bei abweichender Spaltenanzahl (z.B. Komma am Header-Ende) auf die C-Engine zurückfallen
+        return pd.read_csv(path, engine='c', low_memory=False, usecols=usecols)
 
-def calculate_daily_averages(daily_pools):
+def calculate_daily_averages(long):
     """
     Berechne tägliche Durchschnitte für jeden Pool-Key
 
     Args:
-        daily_pools: Dictionary mit Pool-Daten für einen Tag
+        long: DataFrame im langen Format mit den Spalten 'day', 'key' und 'value'
 
     Returns:
-        List von Dictionaries mit key-value Paaren für Durchschnittswerte
+        DataFrame mit einer Zeile pro Tag und einer Spalte pro Pool-Key (NaN wenn der Key fehlt)
     """
-    if not daily_pools:
-        return []
+    # Tage und Keys auf Ganzzahl-Codes abbilden (sortiert für konsistente Reihenfolge)
+    day_codes, days = pd.factorize(long['day'], sort=True)
+    key_codes, keys = pd.factorize(long['key'], sort=True)
+
+    # Summen und Anzahl je (Tag, Key) in einem Durchlauf über flache Indizes
+    flat_idx = day_codes * len(keys) + key_codes
+    size = len(days) * len(keys)
+    sums = np.bincount(flat_idx, weights=long['value'].to_numpy(), minlength=size)
+    counts = np.bincount(flat_idx, minlength=size)
 
-    # Sammle alle Keys
-    all_keys = set()
-    for pool_data in daily_pools:
-        all_keys.update(pool_data.keys())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (sums / counts).reshape(len(days), len(keys))
 
-    # Berechne Durchschnitt für jeden Key
-    avg_pools = []
-    for key in sorted(all_keys):  # Sortiert für konsistente Reihenfolge
-        values = [pool_data.get(key, 0) for pool_data in daily_pools if key in pool_data]
-        if values:
-            avg_value = sum(values) / len(values)
-            avg_pools.append({
-                'key': key,
-                'value': f'{avg_value:.4f} TLM'
-            })
+    return pd.DataFrame(means, index=pd.Index(days, name='day'), columns=pd.Index(keys, name='key'))
 
-    return avg_pools
+def format_daily_averages(day_means):
+    """
+    Formatiere die Durchschnittswerte eines Tages als JSON-String für die CSV
+
+    Args:
+        day_means: Series mit Pool-Keys als Index und Durchschnittswerten
+
+    Returns:
+        JSON-String mit einer Liste von key-value Paaren
+    """
+    avg_pools = [
+        {'key': key, 'value': f'{value:.4f} TLM'}
+        for key, value in day_means.dropna().items()
+    ]
+    return orjson.dumps(avg_pools).decode()
+
+def load_previous_summary(output_file):
+    """
+    Lade eine bereits vorhandene Tageszusammenfassung für die inkrementelle Verarbeitung
+
+    Der letzte gespeicherte Tag war beim vorherigen Lauf eventuell noch unvollständig
+    und wird deshalb nicht übernommen, sondern neu berechnet.
+
+    Args:
+        output_file: Pfad zur bisherigen Ausgabe-CSV-Datei
+
+    Returns:
+        Tuple (DataFrame mit den übernommenen Tagen, letzter gespeicherter Tag)
+        oder (None, None) wenn keine verwertbare Zusammenfassung existiert
+    """
+    try:
+        previous = read_csv_fast(output_file, usecols=['id', 'day', 'avgpool', 'numberofentries'])
+    except (FileNotFoundError, ValueError):
+        return None, None
+
+    if previous.empty:
+        return None, None
+
+    previous = pd.DataFrame({
+        'id': previous['id'].astype('int64'),
+        'day': previous['day'].astype('string').astype(object),
+        'avgpool': previous['avgpool'].astype('string').astype(object),
+        'numberofentries': previous['numberofentries'].astype('int64')
+    })
+
+    # Ungültige Tage (z.B. "Invalid ti" aus älteren Läufen) dürfen nicht der Cursor werden
+    valid_day = pd.to_datetime(previous['day'], format='%Y-%m-%d', errors='coerce').notna()
+    invalid_day_count = int((~valid_day).sum())
+    if invalid_day_count > 0:
+        print(f"⚠ {invalid_day_count} Tage mit ungültigem Datum aus {output_file} entfernt")
+        previous = previous[valid_day]
+
+    if previous.empty:
+        return None, None
+
+    last_day = previous['day'].max()
+
+    return previous[previous['day'] < last_day], last_day
 
 def process_csv_data(input_file, output_file):
     """
     Verarbeite CSV-Daten und erstelle tägliche Zusammenfassung mit erhaltenen Keys
 
+    Existiert die Ausgabedatei bereits, werden nur Tage ab dem zuletzt gespeicherten Tag
+    neu berechnet. Für eine vollständige Neuberechnung die Ausgabedatei löschen.
+
     Args:
         input_file: Pfad zur Eingabe-CSV-Datei
         output_file: Pfad zur Ausgabe-CSV-Datei
@@ -110,8 +195,8 @@ def process_csv_data(input_file, output_file):
         # Lese die CSV-Datei - OHNE LIMIT!
         print(f"Lade Daten aus {input_file}...")
 
-        # Verwende pandas.read_csv OHNE nrows Parameter um ALLE Zeilen zu lesen
-        df = pd.read_csv(input_file)
+        # Lese ALLE Zeilen, aber nur die benötigten Spalten
+        df = read_csv_fast(input_file, usecols=['date', 'pool'])
 
         total_records = len(df)
         print(f"✓ Erfolgreich {total_records} Datensätze geladen")
@@ -122,65 +207,73 @@ def process_csv_data(input_file, output_file):
 
         # Extrahiere Datum (nur Tag) aus der Datumsspalte
         print("Extrahiere Datumsangaben...")
-        df['day'] = df['date'].apply(extract_date)
+        # Die ersten 10 Zeichen sind das Datum im Format YYYY-MM-DD
+        df['day'] = df['date'].astype('string').str.slice(0, 10)
 
-        # Parse Pool-Daten für jede Zeile
-        print(f"Parse Pool-Daten für alle {total_records} Datensätze...")
-        df['parsed_pool'] = df['pool'].apply(parse_pool_data)
+        # Zeilen ohne gültiges Datum (z.B. "Invalid timestamp") nicht als eigenen Tag werten
+        valid_day = df['day'].str.fullmatch(r'\d{4}-\d{2}-\d{2}').fillna(False).astype(bool)
+        invalid_day_count = int((~valid_day).sum())
+        if invalid_day_count > 0:
+            print(f"⚠ {invalid_day_count} Zeilen mit ungültigem Datum wurden übersprungen")
+            df = df[valid_day]
 
-        # Entferne Zeilen wo Pool-Parsing fehlgeschlagen ist
-        valid_rows = df[df['parsed_pool'].apply(lambda x: len(x) > 0)]
-        invalid_count = total_records - len(valid_rows)
+        # Bereits zusammengefasste Tage überspringen
+        previous, last_day = load_previous_summary(output_file)
+        if last_day is not None:
+            df = df[df['day'] >= last_day]
+            print(f"✓ {len(previous)} Tage aus {output_file} übernommen, berechne ab {last_day} neu")
 
-        if invalid_count > 0:
-            print(f"⚠ {invalid_count} Zeilen konnten nicht geparst werden und wurden übersprungen")
+        new_records = len(df)
 
-        print(f"✓ {len(valid_rows)} Datensätze erfolgreich verarbeitet")
+        # Parse Pool-Daten für jede Zeile
+        print(f"Parse Pool-Daten für {new_records} Datensätze...")
+        long = parse_pool_column(df['pool'])
 
-        # Gruppiere nach Tag
-        print("Gruppiere Daten nach Tagen...")
-        daily_groups = valid_rows.groupby('day')
+        long['day'] = df['day'].to_numpy()[long['row'].to_numpy()]
 
-        print(f"✓ Daten für {len(daily_groups)} verschiedene Tage gefunden")
+        # Zeilen ohne gültige Pool-Daten werden übersprungen
+        valid_count = long['row'].nunique()
+        invalid_count = new_records - valid_count
 
-        # Erstelle tägliche Zusammenfassung
-        daily_summary = []
-        day_id = 1
+        if invalid_count > 0:
+            print(f"⚠ {invalid_count} Zeilen konnten nicht geparst werden und wurden übersprungen")
 
-        for day, group in daily_groups:
-            print(f"Verarbeite Tag {day} mit {len(group)} Einträgen...")
+        print(f"✓ {valid_count} Datensätze erfolgreich verarbeitet")
 
-            # Sammle alle Pool-Daten für diesen Tag
-            daily_pools = group['parsed_pool'].tolist()
+        if valid_count == 0:
+            print("Fehler: Keine gültigen Pool-Daten gefunden!")
+            return
 
-            # Berechne Durchschnitte
-            avg_pools = calculate_daily_averages(daily_pools)
+        # Gruppiere nach Tag und berechne Durchschnitte
+        print("Gruppiere Daten nach Tagen...")
+        daily_means = calculate_daily_averages(long)
+        entries_per_day = long.groupby('day')['row'].nunique()
 
-            # Konvertiere zu JSON-String für CSV
-            avg_pools_json = json.dumps(avg_pools, ensure_ascii=False)
+        print(f"✓ Daten für {len(daily_means)} verschiedene Tage gefunden")
 
-            daily_summary.append({
-                'id': day_id,
-                'day': day,
-                'avgpool': avg_pools_json,
-                'numberofentries': len(group)
-            })
+        # Erstelle tägliche Zusammenfassung, IDs setzen die bisherigen fort
+        first_id = int(previous['id'].max()) + 1 if previous is not None and len(previous) else 1
+        summary_df = pd.DataFrame({
+            'id': range(first_id, first_id + len(daily_means)),
+            'day': daily_means.index.to_numpy(dtype=object),
+            'avgpool': daily_means.apply(format_daily_averages, axis=1).to_numpy(dtype=object),
+            'numberofentries': entries_per_day.reindex(daily_means.index).to_numpy()
+        })
 
-            day_id += 1
+        if previous is not None:
+            summary_df = pd.concat([previous, summary_df], ignore_index=True)
 
-        # Erstelle DataFrame und speichere als CSV
-        summary_df = pd.DataFrame(daily_summary)
         summary_df.to_csv(output_file, index=False, encoding='utf-8')
 
         print(f"\n✓ Erfolgreich abgeschlossen!")
-        print(f"✓ Eingabe: {total_records} Datensätze verarbeitet")
-        print(f"✓ Ausgabe: {len(daily_summary)} Tage zusammengefasst")
+        print(f"✓ Eingabe: {new_records} von {total_records} Datensätzen verarbeitet")
+        print(f"✓ Ausgabe: {len(summary_df)} Tage zusammengefasst")
         print(f"✓ Ergebnis gespeichert in: {output_file}")
 
         # Zeige Statistiken
         print("\n=== STATISTIKEN ===")
-        for day_info in daily_summary:
-            print(f"Tag {day_info['day']}: {day_info['numberofentries']} Einträge")
+        for day, entries in zip(summary_df['day'], summary_df['numberofentries']):
+            print(f"Tag {day}: {entries} Einträge")
 
         return summary_df
 